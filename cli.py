@@ -1,13 +1,8 @@
 import os
-import sys
-from typing import Optional
 from rich.console import Console
 from rich.panel import Panel
 from rich.text import Text
-from rich.table import Table
 from rich.prompt import Prompt, Confirm
-from rich import print as rprint
-from utils import GeminiChatbot
 
 class WRTeamCLI:
     def __init__(self):
@@ -16,9 +11,26 @@ class WRTeamCLI:
         self.chat_history = []
         self.current_user = "user123"  # Single user for demo
         
+        # Static output is rendered once here and reused on every print
+        self._welcome_panels = self._build_welcome_panels()
+        self._main_interface_text = self.console.render_str("\n".join([
+            "\n[bold cyan]💬 What can I help you with today?[/bold cyan]",
+            "You can:",
+            "• 🔍 [bold]Search products[/bold] - 'Find football equipment' or 'Show me running shoes'",
+            "• 📦 [bold]Track orders[/bold] - 'Track my orders' or 'Where is order ORD001?'",
+            "• 🛒 [bold]Cart operations[/bold] - 'Show my cart' or 'Add BALL001 to cart'",
+            "• ❓ [bold]Get help[/bold] - 'What's your return policy?' or 'Store hours?'",
+            "• Type '[bold red]exit[/bold red]' to quit\n",
+        ]))
+        self._assistant_header = self.console.render_str("\n[bold blue]🤖 WRTeam Assistant:[/bold blue]")
+        self._user_prompt = Text.from_markup("[bold green]You[/bold green]", style="prompt")
+        self._separator = self.console.render_str("\n" + "─" * 80)
+        
     def initialize_chatbot(self) -> bool:
         """Initialize the Gemini chatbot with API key check"""
         try:
+            # Imported here so the Gemini SDK is only loaded once the chatbot is needed
+            from utils import GeminiChatbot
             self.chatbot = GeminiChatbot()
             return True
         except ValueError as e:
@@ -29,8 +41,8 @@ class WRTeamCLI:
             self.console.print(f"[red]Error initializing chatbot: {e}[/red]")
             return False
     
-    def show_welcome(self):
-        """Display welcome message and store info"""
+    def _build_welcome_panels(self):
+        """Build the welcome and store info panels"""
         welcome_text = Text()
         welcome_text.append("Welcome to ", style="bold blue")
         welcome_text.append("WRTeam Sport Center", style="bold red")
@@ -44,8 +56,6 @@ class WRTeamCLI:
             padding=(1, 2)
         )
         
-        self.console.print(panel)
-        
         # Store info
         store_info = """
 🏪 Your one-stop shop for sports equipment and apparel
@@ -53,23 +63,21 @@ class WRTeamCLI:
 📞 1-800-WRTEAM | 📧 support@wrteam.com
 🚚 Free shipping on orders over $50 | 📅 30-day returns
         """
-        self.console.print(Panel(store_info, border_style="green"))
+        return panel, Panel(store_info, border_style="green")
+    
+    def show_welcome(self):
+        """Display welcome message and store info"""
+        self.console.print(*self._welcome_panels, sep="")
     
     def show_main_interface(self):
         """Display the simple conversational interface"""
-        self.console.print("\n[bold cyan]💬 What can I help you with today?[/bold cyan]")
-        self.console.print("You can:")
-        self.console.print("• 🔍 [bold]Search products[/bold] - 'Find football equipment' or 'Show me running shoes'")
-        self.console.print("• 📦 [bold]Track orders[/bold] - 'Track my orders' or 'Where is order ORD001?'")
-        self.console.print("• 🛒 [bold]Cart operations[/bold] - 'Show my cart' or 'Add BALL001 to cart'")
-        self.console.print("• ❓ [bold]Get help[/bold] - 'What's your return policy?' or 'Store hours?'")
-        self.console.print("• Type '[bold red]exit[/bold red]' to quit\n")
+        self.console.print(self._main_interface_text)
     
     
     def display_chat_response(self, response):
         """Display chatbot response in a formatted way"""
         if response.get('text'):
-            self.console.print(f"\n[bold blue]🤖 WRTeam Assistant:[/bold blue]")
+            self.console.print(self._assistant_header)
             self.console.print(Panel(response['text'], border_style="blue", padding=(0, 1)))
         
         # Show function calls if any (for debugging)
@@ -82,7 +90,7 @@ class WRTeamCLI:
     def run(self):
         """Main CLI loop - Simple conversational interface"""
         # Clear screen and show welcome
-        os.system('clear' if os.name == 'posix' else 'cls')
+        self.console.clear()
         self.show_welcome()
         
         # Initialize chatbot
@@ -96,7 +104,7 @@ class WRTeamCLI:
             try:
                 self.show_main_interface()
                 
-                user_input = Prompt.ask("[bold green]You[/bold green]")
+                user_input = Prompt.ask(self._user_prompt)
                 
                 if user_input.lower() in ['exit', 'quit', 'bye']:
                     self.console.print("\n[bold green]Thanks for shopping with WRTeam Sport Center! 🏆[/bold green]")
@@ -125,7 +133,7 @@ class WRTeamCLI:
                             self.chat_history = cart_response['chat_history']
                 
                 # Add a separator for better readability
-                self.console.print("\n" + "─" * 80)
+                self.console.print(self._separator)
                     
             except KeyboardInterrupt:
                 self.console.print("\n\n[yellow]Exiting... Thanks for shopping with WRTeam! 👋[/yellow]")
@@ -137,17 +145,9 @@ class WRTeamCLI:
     
     def _should_ask_add_to_cart(self, response) -> bool:
         """Check if we should ask about adding items to cart"""
-        if not response.get('function_calls'):
-            return False
-        
         # Only ask if we called search_products and found results
-        for call in response['function_calls']:
-            if (call.get('function') == 'search_products' and 
-                call.get('result') and 
-                len(call.get('result', [])) > 0):
-                return True
-        
-        return False
+        calls = response.get('function_calls') or ()
+        return any(call.get('function') == 'search_products' and call.get('result') for call in calls)
 
 def main():
     """Entry point for the CLI application"""
@@ -1,33 +1,85 @@
-import json
+import atexit
 import os
-from typing import List, Dict, Any, Optional
+import uuid
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 from models import Cart, CartItem, Order
-from functions.product_functions import ProductFunctions
+from functions.product_functions import ProductFunctions, NOT_ENOUGH_STOCK
+from functions.storage import read_json, atomic_write_json, append_encoded_json_line
+
+# Per cart file, the CartFunctions that changed it most recently and has not written it yet.
+# Only that one is flushed at exit, so an older, stale cart never overwrites a newer one.
+_unsaved_carts: Dict[str, "CartFunctions"] = {}
+
+def _flush_unsaved_carts():
+    """Write every cart with unsaved changes when the process exits"""
+    for cart_functions in list(_unsaved_carts.values()):
+        cart_functions.flush()
+
+atexit.register(_flush_unsaved_carts)
 
 class CartFunctions:
-    def __init__(self, data_dir: str = "data"):
+    # Number of buffered cart changes after which the cart is written to disk
+    flush_threshold = 10
+    
+    def __init__(self, data_dir: str = "data", product_functions: Optional[ProductFunctions] = None):
         self.data_dir = data_dir
         self.cart_file = os.path.join(data_dir, "cart.json")
-        self.orders_file = os.path.join(data_dir, "orders.json")
-        self.product_functions = ProductFunctions(data_dir)
+        self.orders_file = os.path.join(data_dir, "orders.jsonl")
+        # Share the caller's ProductFunctions (and its product cache) when given one
+        self.product_functions = product_functions or ProductFunctions(data_dir)
+        
+        # In-memory cart, read on first access and written back by flush()
+        self._cart = None
+        self._dirty = False
+        self._pending_changes = 0
     
     def _load_cart(self, user_id: str = "user123") -> Cart:
-        """Load cart from JSON file"""
-        try:
-            with open(self.cart_file, 'r') as f:
-                cart_data = json.load(f)
-            if cart_data.get('user_id') == user_id:
-                return Cart.from_dict(cart_data)
-            else:
-                return Cart(user_id=user_id, items=[])
-        except FileNotFoundError:
-            return Cart(user_id=user_id, items=[])
+        """Load cart, reading the JSON file only on first access"""
+        if self._cart is None:
+            try:
+                self._cart = Cart.from_dict(read_json(self.cart_file))
+            except FileNotFoundError:
+                self._cart = Cart(user_id=user_id)
+        
+        if self._cart.user_id == user_id:
+            return self._cart
+        return Cart(user_id=user_id)
     
     def _save_cart(self, cart: Cart):
-        """Save cart to JSON file"""
-        with open(self.cart_file, 'w') as f:
-            json.dump(cart.to_dict(), f, indent=2)
+        """Keep cart changes in memory; they reach the JSON file on flush()"""
+        self._cart = cart
+        self._dirty = True
+        self._pending_changes += 1
+        _unsaved_carts[os.path.abspath(self.cart_file)] = self
+        if self._pending_changes >= self.flush_threshold:
+            self.flush()
+    
+    def _get_product_and_stock(self, product_id: str) -> Tuple[Optional[Dict[str, Any]], int]:
+        """Look up a product once, returning its details and stock ((None, 0) if not found)"""
+        product = self.product_functions.get_product_by_id(product_id)
+        if not product:
+            return None, 0
+        return product, product["stock"]
+    
+    def _get_item_name(self, item: CartItem) -> Optional[str]:
+        """Name of a cart item, looked up in the catalog only for items saved without one"""
+        if item.name is None:
+            product = self.product_functions.get_product_by_id(item.product_id)
+            if product:
+                item.name = product["name"]
+        return item.name
+    
+    def flush(self):
+        """Write the in-memory cart to the JSON file if it has unsaved changes"""
+        if not self._dirty:
+            return
+        atomic_write_json(self.cart_file, self._cart.to_dict())
+        self._dirty = False
+        self._pending_changes = 0
+        cart_file = os.path.abspath(self.cart_file)
+        if _unsaved_carts.get(cart_file) is self:
+            del _unsaved_carts[cart_file]
     
     def add_to_cart(self, product_id: str, quantity: int = 1, user_id: str = "user123") -> Dict[str, Any]:
         """
@@ -42,36 +94,30 @@ class CartFunctions:
             Status of the add operation
         """
         # Check if product exists and is available
-        product = self.product_functions.get_product_by_id(product_id)
+        product, stock = self._get_product_and_stock(product_id)
         if not product:
             return {"success": False, "message": "Product not found"}
         
-        availability = self.product_functions.check_product_availability(product_id, quantity)
-        if not availability["available"]:
-            return {"success": False, "message": availability["message"]}
+        if stock < quantity:
+            return {"success": False, "message": NOT_ENOUGH_STOCK}
         
         # Load cart
         cart = self._load_cart(user_id)
         
         # Check if item already in cart
-        existing_item = None
-        for item in cart.items:
-            if item.product_id == product_id:
-                existing_item = item
-                break
+        existing_item = cart.items.get(product_id)
         
         if existing_item:
             # Update quantity
             new_quantity = existing_item.quantity + quantity
             # Check availability for new total quantity
-            availability = self.product_functions.check_product_availability(product_id, new_quantity)
-            if not availability["available"]:
-                return {"success": False, "message": f"Cannot add {quantity} more. {availability['message']}"}
+            if stock < new_quantity:
+                return {"success": False, "message": f"Cannot add {quantity} more. {NOT_ENOUGH_STOCK}"}
             existing_item.quantity = new_quantity
+            existing_item.name = product["name"]
         else:
             # Add new item
-            cart_item = CartItem(product_id=product_id, quantity=quantity, price=product["price"])
-            cart.items.append(cart_item)
+            cart.items[product_id] = CartItem(product_id=product_id, quantity=quantity, price=product["price"], name=product["name"])
         
         self._save_cart(cart)
         return {"success": True, "message": f"Added {quantity} x {product['name']} to cart"}
@@ -89,16 +135,13 @@ class CartFunctions:
         """
         cart = self._load_cart(user_id)
         
-        # Find and remove item
-        for i, item in enumerate(cart.items):
-            if item.product_id == product_id:
-                removed_item = cart.items.pop(i)
-                self._save_cart(cart)
-                product = self.product_functions.get_product_by_id(product_id)
-                product_name = product["name"] if product else product_id
-                return {"success": True, "message": f"Removed {product_name} from cart"}
+        removed_item = cart.items.pop(product_id, None)
+        if removed_item is None:
+            return {"success": False, "message": "Product not found in cart"}
         
-        return {"success": False, "message": "Product not found in cart"}
+        self._save_cart(cart)
+        product_name = self._get_item_name(removed_item) or product_id
+        return {"success": True, "message": f"Removed {product_name} from cart"}
     
     def update_cart_quantity(self, product_id: str, quantity: int, user_id: str = "user123") -> Dict[str, Any]:
         """
@@ -122,16 +165,14 @@ class CartFunctions:
         
         cart = self._load_cart(user_id)
         
-        # Find and update item
-        for item in cart.items:
-            if item.product_id == product_id:
-                item.quantity = quantity
-                self._save_cart(cart)
-                product = self.product_functions.get_product_by_id(product_id)
-                product_name = product["name"] if product else product_id
-                return {"success": True, "message": f"Updated {product_name} quantity to {quantity}"}
+        item = cart.items.get(product_id)
+        if not item:
+            return {"success": False, "message": "Product not found in cart"}
         
-        return {"success": False, "message": "Product not found in cart"}
+        item.quantity = quantity
+        self._save_cart(cart)
+        product_name = self._get_item_name(item) or product_id
+        return {"success": True, "message": f"Updated {product_name} quantity to {quantity}"}
     
     def view_cart(self, user_id: str = "user123") -> Dict[str, Any]:
         """
@@ -148,14 +189,14 @@ class CartFunctions:
         cart_items = []
         total = 0
         
-        for item in cart.items:
-            product = self.product_functions.get_product_by_id(item.product_id)
-            if product:
+        for item in cart.items.values():
+            name = self._get_item_name(item)
+            if name:
                 item_total = item.price * item.quantity
                 total += item_total
                 cart_items.append({
                     "product_id": item.product_id,
-                    "name": product["name"],
+                    "name": name,
                     "price": item.price,
                     "quantity": item.quantity,
                     "item_total": item_total
@@ -177,7 +218,7 @@ class CartFunctions:
         Returns:
             Status of the clear operation
         """
-        cart = Cart(user_id=user_id, items=[])
+        cart = Cart(user_id=user_id)
         self._save_cart(cart)
         return {"success": True, "message": "Cart cleared"}
     
@@ -196,14 +237,16 @@ class CartFunctions:
         if not cart.items:
             return {"success": False, "message": "Cart is empty"}
         
+        # Look up every product in the cart once
+        products = {product_id: self._get_product_and_stock(product_id) for product_id in cart.items}
+        
         # Create order items
         order_items = []
-        total = 0
         
-        for item in cart.items:
+        for item in cart.items.values():
             # Check availability one more time
-            availability = self.product_functions.check_product_availability(item.product_id, item.quantity)
-            if not availability["available"]:
+            product, stock = products[item.product_id]
+            if not product or stock < item.quantity:
                 return {"success": False, "message": f"Product {item.product_id} is no longer available in requested quantity"}
             
             order_item = {
@@ -212,11 +255,11 @@ class CartFunctions:
                 "price": item.price
             }
             order_items.append(order_item)
-            total += item.price * item.quantity
+        
+        total = cart.get_total()
         
         # Generate order ID
-        import uuid
-        order_id = f"ORD{str(uuid.uuid4())[:6].upper()}"
+        order_id = f"ORD{uuid.uuid4().hex[:6].upper()}"
         
         # Create order
         order = Order(
@@ -229,19 +272,11 @@ class CartFunctions:
         )
         
         # Save order
-        try:
-            with open(self.orders_file, 'r') as f:
-                orders_data = json.load(f)
-        except FileNotFoundError:
-            orders_data = []
-        
-        orders_data.append(order.to_dict())
-        
-        with open(self.orders_file, 'w') as f:
-            json.dump(orders_data, f, indent=2)
+        append_encoded_json_line(self.orders_file, order.to_json())
         
         # Clear cart
         self.clear_cart(user_id)
+        self.flush()
         
         return {
             "success": True,
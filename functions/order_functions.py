@@ -1,28 +1,66 @@
-import json
+import bisect
 import os
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 from models import Order
+from models.serialization import TO_DICT
+from functions.storage import read_json_lines, atomic_write_json_lines
 
 class OrderFunctions:
     def __init__(self, data_dir: str = "data"):
         self.data_dir = data_dir
-        self.orders_file = os.path.join(data_dir, "orders.json")
+        self.orders_file = os.path.join(data_dir, "orders.jsonl")
+        # Parsed orders and lookup indexes, rebuilt only when orders.jsonl changes on disk
+        self._cache = None
+        self._file_key = None
+        self._by_id = {}
+        self._by_user = {}
+        self._history_by_user = {}
+        self._history_keys_by_user = {}
+    
+    def _reset_orders(self):
+        """Drop all cached orders and indexes"""
+        self._cache, self._file_key = None, None
+        self._by_id, self._by_user = {}, {}
+        self._history_by_user, self._history_keys_by_user = {}, {}
+    
+    def _add_order(self, order: Order):
+        """Add an order to the cache and indexes, keeping each user's history sorted by created_at"""
+        self._cache.append(order)
+        self._by_id.setdefault(order.id, order)
+        self._by_user.setdefault(order.user_id, []).append(order)
+        
+        # Oldest first; new orders normally land at the end, so this is an append
+        history = self._history_by_user.setdefault(order.user_id, [])
+        keys = self._history_keys_by_user.setdefault(order.user_id, [])
+        index = bisect.bisect_left(keys, order.created_at)
+        keys.insert(index, order.created_at)
+        history.insert(index, order)
     
     def _load_orders(self) -> List[Order]:
-        """Load orders from JSON file"""
+        """Load orders from JSON Lines file, reusing the cached orders while the file is unchanged"""
         try:
-            with open(self.orders_file, 'r') as f:
-                orders_data = json.load(f)
-            return [Order.from_dict(order) for order in orders_data]
+            stat = os.stat(self.orders_file)
         except FileNotFoundError:
+            self._reset_orders()
             return []
+        
+        # Size as well as the nanosecond mtime, so a change within one timestamp tick is still seen
+        file_key = (stat.st_mtime_ns, stat.st_size)
+        if self._cache is not None and file_key == self._file_key:
+            return self._cache
+        
+        self._reset_orders()
+        self._cache = []
+        for row in read_json_lines(self.orders_file):
+            self._add_order(Order.from_dict(row))
+        
+        self._file_key = file_key
+        return self._cache
     
     def _save_orders(self, orders: List[Order]):
-        """Save orders to JSON file"""
-        orders_data = [order.to_dict() for order in orders]
-        with open(self.orders_file, 'w') as f:
-            json.dump(orders_data, f, indent=2)
+        """Save orders to JSON Lines file"""
+        atomic_write_json_lines(self.orders_file, map(TO_DICT, orders))
     
     def get_user_orders(self, user_id: str = "user123") -> List[Dict[str, Any]]:
         """
@@ -34,9 +72,8 @@ class OrderFunctions:
         Returns:
             List of user's orders
         """
-        orders = self._load_orders()
-        user_orders = [order.to_dict() for order in orders if order.user_id == user_id]
-        return user_orders
+        self._load_orders()
+        return list(map(TO_DICT, self._by_user.get(user_id, [])))
     
     def track_order(self, order_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -48,18 +85,19 @@ class OrderFunctions:
         Returns:
             Order details with status if found, None otherwise
         """
-        orders = self._load_orders()
-        for order in orders:
-            if order.id == order_id:
-                return {
-                    "order_id": order.id,
-                    "status": order.status,
-                    "created_at": order.created_at,
-                    "total": order.total,
-                    "items": order.items,
-                    "estimated_delivery": self._get_estimated_delivery(order.status, order.created_at)
-                }
-        return None
+        self._load_orders()
+        order = self._by_id.get(order_id)
+        if not order:
+            return None
+        
+        return {
+            "order_id": order.id,
+            "status": order.status,
+            "created_at": order.created_at,
+            "total": order.total,
+            "items": order.items,
+            "estimated_delivery": self._get_estimated_delivery(order.status, order.created_at)
+        }
     
     def _get_estimated_delivery(self, status: str, created_at: str) -> str:
         """Get estimated delivery date based on order status"""
@@ -83,10 +121,10 @@ class OrderFunctions:
         Returns:
             Recent orders for the user
         """
-        orders = self.get_user_orders(user_id)
-        # Sort by created_at descending
-        orders.sort(key=lambda x: x['created_at'], reverse=True)
-        return orders[:limit]
+        self._load_orders()
+        history = self._history_by_user.get(user_id, [])
+        # History is stored oldest first, so reverse it to put the most recent orders first
+        return list(map(TO_DICT, history[::-1][:limit]))
 
 # Define function schemas for Gemini API
 ORDER_FUNCTION_SCHEMAS = [
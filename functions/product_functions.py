@@ -1,21 +1,49 @@
-import json
 import os
 from typing import List, Dict, Any, Optional
 from models import Product
+from functions.storage import read_json
+
+# Reason given whenever a requested quantity exceeds the stock, here and in CartFunctions
+NOT_ENOUGH_STOCK = "Not enough stock"
 
 class ProductFunctions:
     def __init__(self, data_dir: str = "data"):
         self.data_dir = data_dir
         self.products_file = os.path.join(data_dir, "products.json")
+        # Parsed catalog, reloaded only when products.json changes on disk
+        self._cache = None
+        self._file_key = None
+        self._index_products([])
+    
+    def _index_products(self, products: List[Product]):
+        """Build the by-id index and the per-field columns used by search_products"""
+        self._by_id = {product.id: product for product in products}
+        # One list per field, lowercased once per load, so filters run column by column
+        self._prices = [product.price for product in products]
+        self._categories_lc = [product.category.lower() for product in products]
+        self._names_lc = [product.name.lower() for product in products]
+        self._descriptions_lc = [product.description.lower() for product in products]
     
     def _load_products(self) -> List[Product]:
-        """Load products from JSON file"""
+        """Load products from JSON file, reusing the cached catalog while the file is unchanged"""
         try:
-            with open(self.products_file, 'r') as f:
-                products_data = json.load(f)
-            return [Product.from_dict(product) for product in products_data]
+            stat = os.stat(self.products_file)
         except FileNotFoundError:
+            self._cache, self._file_key = None, None
+            self._index_products([])
             return []
+        
+        # Size as well as the nanosecond mtime, so a rewrite within one timestamp tick is still seen
+        file_key = (stat.st_mtime_ns, stat.st_size)
+        if self._cache is not None and file_key == self._file_key:
+            return self._cache
+        
+        products = [Product.from_dict(product) for product in read_json(self.products_file)]
+        
+        self._cache = products
+        self._file_key = file_key
+        self._index_products(products)
+        return products
     
     def search_products(self, query: str = "", category: str = "", max_price: float = None, min_price: float = None) -> List[Dict[str, Any]]:
         """
@@ -31,26 +59,23 @@ class ProductFunctions:
             List of matching products with their details
         """
         products = self._load_products()
-        results = []
+        matches = range(len(products))
+        
+        # Cheap equality and price filters first, so substring checks only see the shortlist
+        if category:
+            category = category.lower()
+            matches = [i for i in matches if self._categories_lc[i] == category]
+        if max_price is not None:
+            matches = [i for i in matches if self._prices[i] <= max_price]
+        if min_price is not None:
+            matches = [i for i in matches if self._prices[i] >= min_price]
         
-        for product in products:
-            # Text search
-            if query and query.lower() not in product.name.lower() and query.lower() not in product.description.lower():
-                continue
-                
-            # Category filter
-            if category and category.lower() != product.category.lower():
-                continue
-                
-            # Price filters
-            if max_price is not None and product.price > max_price:
-                continue
-            if min_price is not None and product.price < min_price:
-                continue
-            
-            results.append(product.to_dict())
+        # Text search
+        if query:
+            query = query.lower()
+            matches = [i for i in matches if query in self._names_lc[i] or query in self._descriptions_lc[i]]
         
-        return results
+        return [products[i].to_dict() for i in matches]
     
     def get_product_by_id(self, product_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -62,11 +87,9 @@ class ProductFunctions:
         Returns:
             Product details if found, None otherwise
         """
-        products = self._load_products()
-        for product in products:
-            if product.id == product_id:
-                return product.to_dict()
-        return None
+        self._load_products()
+        product = self._by_id.get(product_id)
+        return product.to_dict() if product else None
     
     def check_product_availability(self, product_id: str, quantity: int = 1) -> Dict[str, Any]:
         """
@@ -79,15 +102,16 @@ class ProductFunctions:
         Returns:
             Availability status and stock information
         """
-        product = self.get_product_by_id(product_id)
+        self._load_products()
+        product = self._by_id.get(product_id)
         if not product:
             return {"available": False, "message": "Product not found", "stock": 0}
         
-        available = product["stock"] >= quantity
+        available = product.stock >= quantity
         return {
             "available": available,
-            "message": f"{'Available' if available else 'Not enough stock'}",
-            "stock": product["stock"],
+            "message": "Available" if available else NOT_ENOUGH_STOCK,
+            "stock": product.stock,
             "requested": quantity
         }
 
@@ -0,0 +1,93 @@
+import os
+from typing import Any, Iterable, List
+from models.serialization import dumps, loads
+
+# Large enough that a whole data file goes out in a single write syscall
+WRITE_BUFFER_SIZE = 1 << 20
+
+def read_json(path: str) -> Any:
+    """
+    Read and parse a JSON file.
+
+    Args:
+        path: JSON file to read
+
+    Returns:
+        The parsed JSON value
+    """
+    with open(path, 'rb') as f:
+        return loads(f.read())
+
+def read_json_lines(path: str) -> List[Any]:
+    """
+    Read and parse a JSON Lines file, skipping blank lines.
+
+    A last line without a newline is read too, unless it does not parse yet;
+    then it is treated as still being written and left out.
+
+    Args:
+        path: JSON Lines file to read
+
+    Returns:
+        One parsed value per line
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    end = data.rfind(b"\n") + 1
+    rows = [loads(line) for line in data[:end].splitlines() if line.strip()]
+    
+    tail = data[end:]
+    if tail.strip():
+        try:
+            rows.append(loads(tail))
+        except ValueError:
+            pass
+    return rows
+
+def _atomic_write_bytes(path: str, data: bytes):
+    """Write data to a temporary file next to path and rename it over path"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+        f.write(data)
+        f.flush()
+    os.replace(tmp_path, path)
+
+def atomic_write_json(path: str, data: Any):
+    """
+    Write data as JSON to path without ever leaving a half-written file.
+
+    The JSON is written to a temporary file next to path and then renamed
+    over it, so readers see either the old or the new contents.
+
+    Args:
+        path: Target JSON file
+        data: JSON-serializable object to write
+    """
+    _atomic_write_bytes(path, dumps(data, indent=bool(os.getenv('DEBUG'))))
+
+def atomic_write_json_lines(path: str, rows: Iterable[Any]):
+    """
+    Rewrite a JSON Lines file atomically, one JSON object per line.
+
+    Args:
+        path: Target JSON Lines file
+        rows: JSON-serializable objects to write
+    """
+    _atomic_write_bytes(path, b"".join(dumps(row) + b"\n" for row in rows))
+
+def append_encoded_json_line(path: str, line: bytes):
+    """
+    Append already-encoded JSON as a new line of a JSON Lines file.
+
+    Args:
+        path: Target JSON Lines file (created if missing)
+        line: Single-line JSON document, e.g. from a model's to_json()
+    """
+    with open(path, 'ab+') as f:
+        # A file whose last line has no newline (e.g. edited by hand) would otherwise
+        # get this line glued onto it
+        if f.seek(0, os.SEEK_END) > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                line = b"\n" + line
+        f.write(line + b"\n")
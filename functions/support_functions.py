@@ -1,26 +1,92 @@
-from typing import Dict, Any, List
+from secrets import token_hex
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping
+
+def _freeze(value: Any) -> Any:
+    """Read-only copy of nested dicts and lists, so shared responses cannot be changed by callers"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+_FAQ = _freeze({
+    "return_policy": "You can return items within 30 days of purchase with original receipt. Items must be in original condition.",
+    "shipping": "We offer free shipping on orders over $50. Standard shipping takes 3-5 business days.",
+    "warranty": "All sports equipment comes with a 1-year manufacturer warranty. Apparel has a 90-day warranty.",
+    "size_guide": "Please check our size guide on the product page. We offer exchanges for wrong sizes within 14 days.",
+    "payment": "We accept major credit cards, PayPal, and store credit. Payment is processed securely.",
+    "contact": "You can reach us at support@wrteam.com or call 1-800-WRTEAM during business hours 9AM-6PM EST."
+})
+
+_STORE_INFO = _freeze({
+    "name": "WRTeam Sport Center",
+    "hours": "Monday-Saturday: 9AM-9PM, Sunday: 10AM-6PM",
+    "phone": "1-800-WRTEAM",
+    "email": "support@wrteam.com",
+    "address": "123 Sports Avenue, Athletic City, AC 12345",
+    "website": "www.wrteam.com"
+})
+
+_SIZE_GUIDES = _freeze({
+    "footwear": {
+        "sizes": ["6", "7", "8", "9", "10", "11", "12", "13"],
+        "guide": "Measure your foot length in inches. Add 0.5 inches for comfort.",
+        "tips": "Try shoes in the evening when feet are slightly swollen for best fit."
+    },
+    "apparel": {
+        "sizes": ["XS", "S", "M", "L", "XL", "XXL"],
+        "guide": {
+            "XS": "Chest: 32-34 inches",
+            "S": "Chest: 35-37 inches", 
+            "M": "Chest: 38-40 inches",
+            "L": "Chest: 41-43 inches",
+            "XL": "Chest: 44-46 inches",
+            "XXL": "Chest: 47-49 inches"
+        },
+        "tips": "Measure around the fullest part of your chest for accurate sizing."
+    },
+    "equipment": {
+        "guide": "Equipment sizes vary by sport. Check individual product pages for specific sizing information.",
+        "tips": "Consider your skill level and playing style when choosing equipment sizes."
+    }
+})
+
+_FAQ_TOPICS = tuple(_FAQ)
+_SIZE_GUIDE_CATEGORIES = tuple(_SIZE_GUIDES)
+
+# Support answers never change, so every response is built once and shared read-only
+_HELP_RESPONSES = {
+    topic: MappingProxyType({
+        "topic": topic,
+        "information": information,
+        "additional_help": "For more specific questions, contact our support team."
+    })
+    for topic, information in _FAQ.items()
+}
+
+_HELP_INDEX_RESPONSE = MappingProxyType({
+    "available_topics": _FAQ_TOPICS,
+    "faq": _FAQ,
+    "message": "Here are the help topics available. Ask about any specific topic for detailed information."
+})
+
+_SIZE_GUIDE_RESPONSES = {
+    category: MappingProxyType({"category": category, "size_info": size_info})
+    for category, size_info in _SIZE_GUIDES.items()
+}
+
+_SIZE_GUIDE_INDEX_RESPONSE = MappingProxyType({
+    "available_categories": _SIZE_GUIDE_CATEGORIES,
+    "all_guides": _SIZE_GUIDES,
+    "message": "Size guides available for footwear, apparel, and equipment."
+})
 
 class SupportFunctions:
-    def __init__(self):
-        self.faq = {
-            "return_policy": "You can return items within 30 days of purchase with original receipt. Items must be in original condition.",
-            "shipping": "We offer free shipping on orders over $50. Standard shipping takes 3-5 business days.",
-            "warranty": "All sports equipment comes with a 1-year manufacturer warranty. Apparel has a 90-day warranty.",
-            "size_guide": "Please check our size guide on the product page. We offer exchanges for wrong sizes within 14 days.",
-            "payment": "We accept major credit cards, PayPal, and store credit. Payment is processed securely.",
-            "contact": "You can reach us at support@wrteam.com or call 1-800-WRTEAM during business hours 9AM-6PM EST."
-        }
-        
-        self.store_info = {
-            "name": "WRTeam Sport Center",
-            "hours": "Monday-Saturday: 9AM-9PM, Sunday: 10AM-6PM",
-            "phone": "1-800-WRTEAM",
-            "email": "support@wrteam.com",
-            "address": "123 Sports Avenue, Athletic City, AC 12345",
-            "website": "www.wrteam.com"
-        }
+    faq = _FAQ
+    store_info = _STORE_INFO
     
-    def get_help(self, topic: str = "") -> Dict[str, Any]:
+    def get_help(self, topic: str = "") -> Mapping[str, Any]:
         """
         Get help information on various topics.
         
@@ -30,21 +96,14 @@ class SupportFunctions:
         Returns:
             Help information
         """
-        if topic.lower() in self.faq:
-            return {
-                "topic": topic,
-                "information": self.faq[topic.lower()],
-                "additional_help": "For more specific questions, contact our support team."
-            }
-        
-        # Return all available topics if no specific topic requested
-        return {
-            "available_topics": list(self.faq.keys()),
-            "faq": self.faq,
-            "message": "Here are the help topics available. Ask about any specific topic for detailed information."
-        }
+        # Topics usually arrive already lowercase, so only lowercase on a miss
+        response = _HELP_RESPONSES.get(topic)
+        if response is None:
+            # Unknown or empty topics get the list of all available topics
+            response = _HELP_RESPONSES.get(topic.lower(), _HELP_INDEX_RESPONSE)
+        return response
     
-    def get_store_info(self) -> Dict[str, Any]:
+    def get_store_info(self) -> Mapping[str, Any]:
         """
         Get store contact information and details.
         
@@ -64,8 +123,7 @@ class SupportFunctions:
         Returns:
             Issue report confirmation
         """
-        import uuid
-        ticket_id = f"TICKET{str(uuid.uuid4())[:8].upper()}"
+        ticket_id = f"TICKET{token_hex(4).upper()}"
         
         return {
             "success": True,
@@ -76,7 +134,7 @@ class SupportFunctions:
             "next_steps": "Check your email for updates or contact us at support@wrteam.com with your ticket ID."
         }
     
-    def get_size_guide(self, category: str = "") -> Dict[str, Any]:
+    def get_size_guide(self, category: str = "") -> Mapping[str, Any]:
         """
         Get size guide information for different product categories.
         
@@ -86,41 +144,12 @@ class SupportFunctions:
         Returns:
             Size guide information
         """
-        size_guides = {
-            "footwear": {
-                "sizes": ["6", "7", "8", "9", "10", "11", "12", "13"],
-                "guide": "Measure your foot length in inches. Add 0.5 inches for comfort.",
-                "tips": "Try shoes in the evening when feet are slightly swollen for best fit."
-            },
-            "apparel": {
-                "sizes": ["XS", "S", "M", "L", "XL", "XXL"],
-                "guide": {
-                    "XS": "Chest: 32-34 inches",
-                    "S": "Chest: 35-37 inches", 
-                    "M": "Chest: 38-40 inches",
-                    "L": "Chest: 41-43 inches",
-                    "XL": "Chest: 44-46 inches",
-                    "XXL": "Chest: 47-49 inches"
-                },
-                "tips": "Measure around the fullest part of your chest for accurate sizing."
-            },
-            "equipment": {
-                "guide": "Equipment sizes vary by sport. Check individual product pages for specific sizing information.",
-                "tips": "Consider your skill level and playing style when choosing equipment sizes."
-            }
-        }
-        
-        if category.lower() in size_guides:
-            return {
-                "category": category,
-                "size_info": size_guides[category.lower()]
-            }
-        
-        return {
-            "available_categories": list(size_guides.keys()),
-            "all_guides": size_guides,
-            "message": "Size guides available for footwear, apparel, and equipment."
-        }
+        # Categories usually arrive already lowercase, so only lowercase on a miss
+        response = _SIZE_GUIDE_RESPONSES.get(category)
+        if response is None:
+            # Unknown or empty categories get all size guides
+            response = _SIZE_GUIDE_RESPONSES.get(category.lower(), _SIZE_GUIDE_INDEX_RESPONSE)
+        return response
 
 # Define function schemas for Gemini API
 SUPPORT_FUNCTION_SCHEMAS = [
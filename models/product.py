@@ -1,8 +1,12 @@
-from dataclasses import dataclass
-from typing import List, Optional
-import json
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+import sys
+from .serialization import TO_DICT, dumps
 
-@dataclass
+# slots=True (no per-instance __dict__) needs Python 3.10+; older versions get plain dataclasses
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(frozen=True, **_SLOTS)
 class Product:
     id: str
     name: str
@@ -13,21 +17,16 @@ class Product:
     brand: str
     
     def to_dict(self):
-        return {
-            'id': self.id,
-            'name': self.name,
-            'category': self.category,
-            'price': self.price,
-            'description': self.description,
-            'stock': self.stock,
-            'brand': self.brand
-        }
+        return {name: getattr(self, name) for name in self.__dataclass_fields__}
+    
+    def to_json(self) -> bytes:
+        return dumps(self)
     
     @classmethod
     def from_dict(cls, data: dict):
         return cls(**data)
 
-@dataclass
+@dataclass(**_SLOTS)
 class Order:
     id: str
     user_id: str
@@ -37,47 +36,58 @@ class Order:
     created_at: str
     
     def to_dict(self):
-        return {
-            'id': self.id,
-            'user_id': self.user_id,
-            'items': self.items,
-            'total': self.total,
-            'status': self.status,
-            'created_at': self.created_at
-        }
+        return {name: getattr(self, name) for name in self.__dataclass_fields__}
+    
+    def to_json(self) -> bytes:
+        return dumps(self)
     
     @classmethod
     def from_dict(cls, data: dict):
         return cls(**data)
 
-@dataclass
+@dataclass(**_SLOTS)
 class CartItem:
     product_id: str
     quantity: int
     price: float
+    name: Optional[str] = None  # product name captured when the item was added
     
     def to_dict(self):
-        return {
+        data = {
             'product_id': self.product_id,
             'quantity': self.quantity,
             'price': self.price
         }
+        if self.name is not None:
+            data['name'] = self.name
+        return data
+    
+    def to_json(self) -> bytes:
+        return dumps(self.to_dict())
 
-@dataclass
+@dataclass(**_SLOTS)
 class Cart:
     user_id: str
-    items: List[CartItem]
+    items: Dict[str, CartItem] = field(default_factory=dict)  # keyed by product_id, serialized as a list
     
     def to_dict(self):
         return {
             'user_id': self.user_id,
-            'items': [item.to_dict() for item in self.items]
+            'items': list(map(TO_DICT, self.items.values()))
         }
     
+    def to_json(self) -> bytes:
+        return dumps(self.to_dict())
+    
     @classmethod
     def from_dict(cls, data: dict):
-        items = [CartItem(**item) for item in data.get('items', [])]
+        items = {
+            item['product_id']: CartItem(item['product_id'], item['quantity'], item['price'], item.get('name'))
+            for item in data.get('items', ())
+        }
         return cls(user_id=data['user_id'], items=items)
     
     def get_total(self) -> float:
-        return sum(item.price * item.quantity for item in self.items)
\ No newline at end of file
+        # A list comprehension avoids the generator frame switch per item; carts are far
+        # too small for an array library to pay off
+        return sum([item.price * item.quantity for item in self.items.values()])
\ No newline at end of file
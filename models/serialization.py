@@ -0,0 +1,31 @@
+import json
+from operator import methodcaller
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the standard library is used without it
+    orjson = None
+
+# C-level callable for serializing many model instances with map()
+TO_DICT = methodcaller('to_dict')
+
+def _model_to_dict(obj: Any) -> dict:
+    """json.dumps hook for model instances, which orjson serializes natively as dataclasses"""
+    to_dict = getattr(obj, 'to_dict', None)
+    if to_dict is None:
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+    return to_dict()
+
+if orjson is not None:
+    def dumps(data: Any, indent: bool = False) -> bytes:
+        """Serialize data to JSON bytes; models are read field by field, without an intermediate dict"""
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0)
+    
+    loads = orjson.loads
+else:
+    def dumps(data: Any, indent: bool = False) -> bytes:
+        """Serialize data to JSON bytes; models are serialized through their to_dict()"""
+        return json.dumps(data, indent=2 if indent else None, default=_model_to_dict).encode()
+    
+    loads = json.loads
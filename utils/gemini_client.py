@@ -1,8 +1,9 @@
 import os
+import sys
 import json
+from functools import lru_cache
+from types import MappingProxyType
 from typing import Dict, Any, List, Optional, Callable
-from dotenv import load_dotenv
-import google.generativeai as genai
 from functions import (
     ProductFunctions, PRODUCT_FUNCTION_SCHEMAS,
     OrderFunctions, ORDER_FUNCTION_SCHEMAS,
@@ -10,10 +11,114 @@ from functions import (
     SupportFunctions, SUPPORT_FUNCTION_SCHEMAS
 )
 
-load_dotenv()
+@lru_cache(maxsize=None)
+def _load_env():
+    """Load .env once per process, however many chatbots are created"""
+    from dotenv import load_dotenv
+    load_dotenv()
+
+# Static pieces of the formatted function results
+_PRODUCT_LINE_TEMPLATE = "🏷️ **{name}** (ID: {id})\n   💰 ${price} | 📦 {stock} in stock\n   📝 {description}\n\n"
+_SEARCH_RESULTS_FOOTER = "To add any item to your cart, just tell me:\n• 'Add [PRODUCT_ID] to cart' (e.g., 'Add BALL001 to cart')\n• Or I'll ask you after showing the results!"
+_NO_PRODUCTS_FOUND = "I couldn't find any products matching your search. Please try different search terms or browse our categories: Football, Baseball, Tennis, Apparel, Footwear, Safety equipment."
+_CART_LINE_TEMPLATE = "• {name} (ID: {product_id})\n  Quantity: {quantity} × ${price} = ${item_total:.2f}\n\n"
+_CART_FOOTER = "💡 **Next steps:**\n• Tell me 'Checkout my cart' when ready\n• Continue shopping to add more items\n• Ask me to 'Remove [PRODUCT_ID] from cart' to remove items"
+_EMPTY_CART = "🛒 Your cart is empty. Browse our products and add some items!"
+_ORDER_ITEM_LINE_TEMPLATE = "• Product {product_id}: {quantity} × ${price}\n"
+_ORDER_NOT_FOUND = "❌ Order not found. Please check the order ID and try again."
+_USER_ORDERS_FOOTER = "\nTo track a specific order, just tell me the order ID (like ORD001)."
+_NO_ORDERS = "You don't have any orders yet. Start shopping to place your first order!"
+
+@lru_cache(maxsize=128)
+def _format_help_topic(topic: str, information: str, additional_help: str) -> str:
+    """Format a single help topic; the same few topics are asked about repeatedly"""
+    return f"**{topic.replace('_', ' ').title()} Information:**\n{information}\n\n{additional_help}"
+
+@lru_cache(maxsize=16)
+def _format_help_index(topics: tuple) -> str:
+    """Format the list of available help topics"""
+    lines = ["🏪 **WRTeam Sport Center Help**\n\nAvailable topics:\n"]
+    lines.extend(f"• {topic.replace('_', ' ').title()}\n" for topic in topics)
+    return "".join(lines)
+
+def _format_search_products(result: List[Dict[str, Any]]) -> str:
+    if not result:
+        return _NO_PRODUCTS_FOUND
+    parts = [f"I found {len(result)} products matching your search:\n\n"]
+    parts.extend(map(_PRODUCT_LINE_TEMPLATE.format_map, result[:3]))  # Show top 3 results
+    
+    if len(result) > 3:
+        parts.append(f"... and {len(result) - 3} more products.\n\n")
+    
+    parts.append(_SEARCH_RESULTS_FOOTER)
+    return "".join(parts)
+
+def _format_add_to_cart(result: Dict[str, Any]) -> str:
+    if result.get('success'):
+        return f"✅ {result['message']}\n\nWould you like to view your cart or continue shopping?"
+    return f"❌ {result['message']}\n\nPlease check the product ID and try again."
+
+def _format_view_cart(result: Dict[str, Any]) -> str:
+    if not result['items']:
+        return _EMPTY_CART
+    parts = [f"🛒 **Your Cart** ({result['item_count']} items):\n\n"]
+    parts.extend(map(_CART_LINE_TEMPLATE.format_map, result['items']))
+    parts.append(f"**Total: ${result['total']:.2f}**\n\n")
+    parts.append(_CART_FOOTER)
+    return "".join(parts)
+
+def _format_track_order(result: Optional[Dict[str, Any]]) -> str:
+    if not result:
+        return _ORDER_NOT_FOUND
+    parts = [
+        f"📦 **Order {result['order_id']}**\n",
+        f"Status: {result['status'].upper()}\n",
+        f"Total: ${result['total']:.2f}\n",
+        f"Created: {result['created_at']}\n",
+        f"{result['estimated_delivery']}\n\n",
+        "**Items:**\n"
+    ]
+    parts.extend(map(_ORDER_ITEM_LINE_TEMPLATE.format_map, result['items']))
+    return "".join(parts)
+
+def _format_user_orders(result: List[Dict[str, Any]]) -> str:
+    if not result:
+        return _NO_ORDERS
+    parts = [f"📋 **Your Orders** ({len(result)} orders):\n\n"]
+    parts.extend(f"• **{order['id']}** - ${order['total']:.2f} - {order['status'].upper()}\n" for order in result)
+    parts.append(_USER_ORDERS_FOOTER)
+    return "".join(parts)
+
+def _format_help(result: Dict[str, Any]) -> str:
+    if result.get('topic'):
+        return _format_help_topic(result['topic'], result['information'], result.get('additional_help', ''))
+    return _format_help_index(tuple(result.get('available_topics', ())))
+
+# Result formatter for each function name, looked up once per function call
+_FORMATTERS: Dict[str, Callable[[Any], str]] = {
+    'search_products': _format_search_products,
+    'add_to_cart': _format_add_to_cart,
+    'view_cart': _format_view_cart,
+    'track_order': _format_track_order,
+    'get_user_orders': _format_user_orders,
+    'get_help': _format_help,
+}
+
+# Declarations for the functions the model may call, built once from the module schemas.
+# Only functions with a formatter are offered, so the model cannot trigger actions such as
+# checkout or clear_cart whose results would reach the user as raw dicts.
+_FUNCTION_DECLARATIONS = tuple(
+    schema
+    for schema in PRODUCT_FUNCTION_SCHEMAS + ORDER_FUNCTION_SCHEMAS + CART_FUNCTION_SCHEMAS + SUPPORT_FUNCTION_SCHEMAS
+    if schema["name"] in _FORMATTERS
+)
 
 class GeminiChatbot:
     def __init__(self, data_dir: str = "data"):
+        # The Gemini SDK pulls in grpc/protobuf, so it is only imported once a chatbot is created
+        import google.generativeai as genai
+        _load_env()
+        
         # Initialize API
         self.api_key = os.getenv('GEMINI_API_KEY')
         if not self.api_key:
@@ -24,11 +129,11 @@ class GeminiChatbot:
         # Initialize function handlers
         self.product_functions = ProductFunctions(data_dir)
         self.order_functions = OrderFunctions(data_dir)
-        self.cart_functions = CartFunctions(data_dir)
+        self.cart_functions = CartFunctions(data_dir, self.product_functions)
         self.support_functions = SupportFunctions()
         
-        # Function mapping
-        self.function_map = {
+        # Function mapping, read-only and keyed by interned names
+        self.function_map = MappingProxyType({sys.intern(name): function for name, function in {
             # Product functions
             'search_products': self.product_functions.search_products,
             'get_product_by_id': self.product_functions.get_product_by_id,
@@ -52,16 +157,10 @@ class GeminiChatbot:
             'get_store_info': self.support_functions.get_store_info,
             'report_issue': self.support_functions.report_issue,
             'get_size_guide': self.support_functions.get_size_guide,
-        }
+        }.items()})
         
-        # Create function declarations for Gemini (following official format)
-        self.function_declarations = self._create_function_declarations()
-        
-        # Create model with tools (following official documentation)
-        self.model = genai.GenerativeModel(
-            model_name='gemini-1.5-pro',
-            tools=[{'function_declarations': self.function_declarations}]
-        )
+        # Function declarations for Gemini (following official format), shared by all instances
+        self.function_declarations = _FUNCTION_DECLARATIONS
         
         # System prompt
         self.system_prompt = """You are a helpful customer service assistant for WRTeam Sport Center, a sports equipment and apparel store.
@@ -89,119 +188,13 @@ Store Information:
 - Free shipping on orders over $50
 - 30-day return policy
 - Customer service: support@wrteam.com, 1-800-WRTEAM"""
-    
-    def _create_function_declarations(self) -> List[Dict[str, Any]]:
-        """Create function declaration dictionaries following official Gemini API format"""
-        declarations = []
-        
-        # Product functions
-        declarations.append({
-            "name": "search_products",
-            "description": "Search for sports products based on various criteria like name, category, and price range",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "query": {
-                        "type": "string", 
-                        "description": "Search term for product name or description"
-                    },
-                    "category": {
-                        "type": "string", 
-                        "description": "Product category (e.g., Football, Baseball, Tennis, Apparel, Safety, Footwear)"
-                    },
-                    "max_price": {
-                        "type": "number", 
-                        "description": "Maximum price filter"
-                    },
-                    "min_price": {
-                        "type": "number", 
-                        "description": "Minimum price filter"
-                    }
-                }
-            }
-        })
-        
-        declarations.append({
-            "name": "add_to_cart",
-            "description": "Add a product to the shopping cart",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "product_id": {
-                        "type": "string", 
-                        "description": "Product ID to add to cart"
-                    },
-                    "quantity": {
-                        "type": "integer", 
-                        "description": "Quantity to add (default: 1)"
-                    },
-                    "user_id": {
-                        "type": "string", 
-                        "description": "User ID (defaults to current user if not provided)"
-                    }
-                },
-                "required": ["product_id"]
-            }
-        })
         
-        declarations.append({
-            "name": "view_cart",
-            "description": "View current shopping cart contents",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "user_id": {
-                        "type": "string", 
-                        "description": "User ID (defaults to current user if not provided)"
-                    }
-                }
-            }
-        })
-        
-        declarations.append({
-            "name": "track_order",
-            "description": "Track the status of a specific order using order ID",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "order_id": {
-                        "type": "string", 
-                        "description": "The unique order ID to track (e.g., ORD001, ORD002)"
-                    }
-                },
-                "required": ["order_id"]
-            }
-        })
-        
-        declarations.append({
-            "name": "get_user_orders",
-            "description": "Get all orders for a specific user",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "user_id": {
-                        "type": "string", 
-                        "description": "User ID (defaults to current user if not provided)"
-                    }
-                }
-            }
-        })
-        
-        declarations.append({
-            "name": "get_help",
-            "description": "Get help information on various topics like return policy, shipping, warranty, etc.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "topic": {
-                        "type": "string", 
-                        "description": "Help topic (return_policy, shipping, warranty, size_guide, payment, contact)"
-                    }
-                }
-            }
-        })
-        
-        return declarations
+        # Create model with tools and the system prompt (following official documentation)
+        self.model = genai.GenerativeModel(
+            model_name='gemini-1.5-pro',
+            tools=[{'function_declarations': list(self.function_declarations)}],
+            system_instruction=self.system_prompt
+        )
     
     def chat(self, message: str, chat_history: Optional[List] = None) -> Dict[str, Any]:
         """
@@ -216,13 +209,9 @@ Store Information:
             Response with text and any function call results
         """
         try:
-            # Start a chat session
+            # Start a chat session; the system prompt is part of the model, so no extra turn is needed
             chat = self.model.start_chat(history=chat_history or [])
             
-            # Add system prompt if this is a new conversation
-            if not chat_history:
-                system_response = chat.send_message(self.system_prompt)
-            
             # Send the user message
             response = chat.send_message(message)
             
@@ -230,47 +219,49 @@ Store Information:
             final_text = ""
             
             # Process the response
-            if response.candidates and response.candidates[0].content.parts:
-                for part in response.candidates[0].content.parts:
-                    # Check if this part contains a function call
-                    if hasattr(part, 'function_call') and part.function_call:
-                        func_call = part.function_call
-                        func_name = func_call.name
-                        
-                        # Extract function arguments
-                        func_args = {}
-                        if func_call.args:
-                            for key, value in func_call.args.items():
-                                func_args[key] = value
-                        
-                        # Execute the function if it exists in our mapping
-                        if func_name in self.function_map:
-                            try:
-                                result = self.function_map[func_name](**func_args)
-                                function_results.append({
-                                    'function': func_name,
-                                    'args': func_args,
-                                    'result': result
-                                })
-                                
-                                # For now, let's format the result directly in text
-                                # This approach works while we figure out the function response format
-                                final_text = self._format_function_result(func_name, result)
-                                
-                            except Exception as e:
-                                function_results.append({
-                                    'function': func_name,
-                                    'args': func_args,
-                                    'error': str(e)
-                                })
-                                final_text = f"I encountered an error executing {func_name}: {str(e)}"
-                        else:
-                            final_text = f"Unknown function: {func_name}"
+            candidates = response.candidates
+            parts = candidates[0].content.parts if candidates else ()
+            function_map = self.function_map
+            for part in parts:
+                # Check if this part contains a function call
+                func_call = getattr(part, 'function_call', None)
+                if func_call:
+                    func_name = sys.intern(func_call.name)
                     
-                    elif hasattr(part, 'text') and part.text:
-                        # Regular text response
-                        final_text = part.text
-            
+                    # Extract function arguments
+                    func_args = dict(func_call.args) if func_call.args else {}
+                    
+                    # Execute the function if it exists in our mapping
+                    function = function_map.get(func_name)
+                    if function is not None:
+                        try:
+                            result = function(**func_args)
+                            function_results.append({
+                                'function': func_name,
+                                'args': func_args,
+                                'result': result
+                            })
+                            
+                            # For now, let's format the result directly in text
+                            # This approach works while we figure out the function response format
+                            final_text = self._format_function_result(func_name, result)
+                            
+                        except Exception as e:
+                            function_results.append({
+                                'function': func_name,
+                                'args': func_args,
+                                'error': str(e)
+                            })
+                            final_text = f"I encountered an error executing {func_name}: {str(e)}"
+                    else:
+                        final_text = f"Unknown function: {func_name}"
+                
+                else:
+                    # Regular text response
+                    text = getattr(part, 'text', None)
+                    if text:
+                        final_text = text
+        
             # If no text was set, use the response text directly
             if not final_text and hasattr(response, 'text'):
                 final_text = response.text
@@ -290,75 +281,8 @@ Store Information:
     
     def _format_function_result(self, func_name: str, result: Any) -> str:
         """Format function results into natural language responses"""
-        if func_name == "search_products":
-            if result:
-                text = f"I found {len(result)} products matching your search:\n\n"
-                for product in result[:3]:  # Show top 3 results
-                    text += f"🏷️ **{product['name']}** (ID: {product['id']})\n"
-                    text += f"   💰 ${product['price']} | 📦 {product['stock']} in stock\n"
-                    text += f"   📝 {product['description']}\n\n"
-                
-                if len(result) > 3:
-                    text += f"... and {len(result) - 3} more products.\n\n"
-                
-                text += "To add any item to your cart, just tell me:\n• 'Add [PRODUCT_ID] to cart' (e.g., 'Add BALL001 to cart')\n• Or I'll ask you after showing the results!"
-                return text
-            else:
-                return "I couldn't find any products matching your search. Please try different search terms or browse our categories: Football, Baseball, Tennis, Apparel, Footwear, Safety equipment."
-        
-        elif func_name == "add_to_cart":
-            if result.get('success'):
-                return f"✅ {result['message']}\n\nWould you like to view your cart or continue shopping?"
-            else:
-                return f"❌ {result['message']}\n\nPlease check the product ID and try again."
-        
-        elif func_name == "view_cart":
-            if result['items']:
-                text = f"🛒 **Your Cart** ({result['item_count']} items):\n\n"
-                for item in result['items']:
-                    text += f"• {item['name']} (ID: {item['product_id']})\n"
-                    text += f"  Quantity: {item['quantity']} × ${item['price']} = ${item['item_total']:.2f}\n\n"
-                text += f"**Total: ${result['total']:.2f}**\n\n"
-                text += "💡 **Next steps:**\n• Tell me 'Checkout my cart' when ready\n• Continue shopping to add more items\n• Ask me to 'Remove [PRODUCT_ID] from cart' to remove items"
-                return text
-            else:
-                return "🛒 Your cart is empty. Browse our products and add some items!"
-        
-        elif func_name == "track_order":
-            if result:
-                text = f"📦 **Order {result['order_id']}**\n"
-                text += f"Status: {result['status'].upper()}\n"
-                text += f"Total: ${result['total']:.2f}\n"
-                text += f"Created: {result['created_at']}\n"
-                text += f"{result['estimated_delivery']}\n\n"
-                text += "**Items:**\n"
-                for item in result['items']:
-                    text += f"• Product {item['product_id']}: {item['quantity']} × ${item['price']}\n"
-                return text
-            else:
-                return "❌ Order not found. Please check the order ID and try again."
-        
-        elif func_name == "get_user_orders":
-            if result:
-                text = f"📋 **Your Orders** ({len(result)} orders):\n\n"
-                for order in result:
-                    text += f"• **{order['id']}** - ${order['total']:.2f} - {order['status'].upper()}\n"
-                text += "\nTo track a specific order, just tell me the order ID (like ORD001)."
-                return text
-            else:
-                return "You don't have any orders yet. Start shopping to place your first order!"
-        
-        elif func_name == "get_help":
-            if result.get('topic'):
-                return f"**{result['topic'].replace('_', ' ').title()} Information:**\n{result['information']}\n\n{result.get('additional_help', '')}"
-            else:
-                text = "🏪 **WRTeam Sport Center Help**\n\nAvailable topics:\n"
-                for topic in result.get('available_topics', []):
-                    text += f"• {topic.replace('_', ' ').title()}\n"
-                return text
-        
-        # Default formatting
-        return str(result)
+        # Functions without a dedicated formatter fall back to the default formatting
+        return _FORMATTERS.get(func_name, str)(result)
     
     def get_available_functions(self) -> List[str]:
         """Get list of available function names"""